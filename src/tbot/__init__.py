@@ -1,6 +1,34 @@
-"""tbot package exposing order orchestration and Telegram entrypoints."""
+"""tbot package exposing order orchestration and Telegram entrypoints.
 
-from .services.bundler import OrderBundler
-from .services.order_service import OrderOrchestrator
+Exports are resolved lazily so that ``import tbot`` stays cheap for workers
+and batch jobs that only need part of the package.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .services.bundler import OrderBundler
+    from .services.order_service import OrderOrchestrator
+
+_LAZY_EXPORTS = {
+    "OrderBundler": ".services.bundler",
+    "OrderOrchestrator": ".services.order_service",
+}
 
 __all__ = ["OrderBundler", "OrderOrchestrator"]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
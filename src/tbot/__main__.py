@@ -1,15 +1,43 @@
 from __future__ import annotations
 
+import argparse
 import logging
-
-from .telegram.app import run_polling
-
-
-logging.basicConfig(level=logging.INFO)
-
-
-def main() -> None:
-    run_polling()
+import sys
+from typing import Optional, Sequence
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m tbot")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("bot", help="run the Telegram bot with long polling (default)")
+    engine = commands.add_parser("engine", help="run headless, reading JSON-lines requests")
+    transport = engine.add_mutually_exclusive_group()
+    transport.add_argument("--tcp", metavar="HOST:PORT", help="listen on a TCP socket instead of stdin")
+    transport.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of stdin")
+    startup = commands.add_parser("startup-time", help="measure cold import time of the entrypoints")
+    startup.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    if args.command == "engine":
+        from .engine import Engine, run_socket, run_stdio
+
+        if args.tcp:
+            host, _, port = args.tcp.rpartition(":")
+            run_socket(Engine(), host=host or "127.0.0.1", port=int(port))
+        elif args.unix:
+            run_socket(Engine(), path=args.unix)
+        else:
+            run_stdio(Engine(), sys.stdin, sys.stdout)
+    elif args.command == "startup-time":
+        from .startup import format_startup, measure_startup
+
+        print(format_startup(measure_startup(runs=args.runs)))
+    else:
+        from .telegram.app import run_polling
+
+        run_polling()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+"""Headless engine driving the orchestrator and wallet manager over JSON lines.
+
+Each request is one JSON object per line carrying an ``op`` and optional
+``id``; each response echoes the ``id`` with either ``ok: true`` and a
+``result`` or ``ok: false`` and an ``error``. Supported ops:
+
+``create_wallet``    ``user_id``, optional ``chain``
+``list_wallets``     ``user_id``
+``submit_order``     ``user_id``, ``token_address``, ``side``, ``amount``,
+                     optional ``wallet_id`` (defaults to the user's first wallet)
+``flush``            optional ``force``
+``set_min_wallets``  ``wallet_count``
+``portfolio``        optional ``user_id`` to restrict to that user's wallets
+``history``
+
+The engine runs over stdin/stdout or a TCP/Unix socket without importing
+python-telegram-bot.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+from .models import ExecutionResult, OrderSide, Wallet
+from .services.order_service import OrderOrchestrator, make_order
+from .services.wallets import WalletManager
+
+logger = logging.getLogger(__name__)
+
+
+class EngineError(ValueError):
+    """Raised for malformed or unserviceable engine requests."""
+
+
+@dataclass
+class Engine:
+    orchestrator: OrderOrchestrator = field(default_factory=OrderOrchestrator)
+    wallets: WalletManager = field(default_factory=WalletManager)
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = request.get("id")
+        op = request.get("op", "")
+        try:
+            handler = self._handlers().get(op) if isinstance(op, str) else None
+            if handler is None:
+                raise EngineError(f"unknown op {op!r}")
+            result = handler(request)
+        except KeyError as exc:
+            return {"id": request_id, "ok": False, "error": f"missing field {exc}"}
+        except (TypeError, ValueError, OverflowError, InvalidOperation) as exc:
+            return {"id": request_id, "ok": False, "error": str(exc) or type(exc).__name__}
+        return {"id": request_id, "ok": True, "result": result}
+
+    def handle_line(self, line: str) -> str:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as exc:
+            return json.dumps({"id": None, "ok": False, "error": f"invalid JSON: {exc.msg}"})
+        if not isinstance(request, dict):
+            return json.dumps({"id": None, "ok": False, "error": "request must be a JSON object"})
+        return json.dumps(self.handle(request), default=str)
+
+    def _handlers(self) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+        return {
+            "create_wallet": self._create_wallet,
+            "list_wallets": self._list_wallets,
+            "submit_order": self._submit_order,
+            "flush": self._flush,
+            "set_min_wallets": self._set_min_wallets,
+            "portfolio": self._portfolio,
+            "history": self._history,
+        }
+
+    def _create_wallet(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return _wallet_payload(self.wallets.create_wallet(_int_field(request, "user_id"), request.get("chain")))
+
+    def _list_wallets(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [_wallet_payload(wallet) for wallet in self.wallets.list_wallets(_int_field(request, "user_id"))]
+
+    def _submit_order(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        user_id = _int_field(request, "user_id")
+        wallet_id = request.get("wallet_id")
+        if wallet_id is None:
+            wallets = self.wallets.list_wallets(user_id)
+            if not wallets:
+                raise EngineError("no wallets found for user; call create_wallet first")
+            wallet_id = wallets[0].wallet_id
+        else:
+            wallet = self.wallets.get_wallet(wallet_id)
+            if wallet is None or wallet.owner_id != user_id:
+                raise EngineError(f"wallet {wallet_id!r} does not belong to user {user_id}")
+        order = make_order(
+            user_id=user_id,
+            wallet_id=wallet_id,
+            token_address=request["token_address"],
+            side=OrderSide(request["side"]),
+            amount=str(request["amount"]),
+        )
+        return [_result_payload(result) for result in self.orchestrator.submit_order(order)]
+
+    def _flush(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        force = request.get("force", False)
+        if not isinstance(force, bool):
+            raise EngineError("force must be a JSON boolean")
+        results = self.orchestrator.flush(force=force)
+        return [_result_payload(result) for result in results]
+
+    def _set_min_wallets(self, request: Dict[str, Any]) -> Dict[str, int]:
+        wallet_count = _int_field(request, "wallet_count")
+        self.orchestrator.set_min_wallets(wallet_count)
+        return {"wallet_count": wallet_count}
+
+    def _portfolio(self, request: Dict[str, Any]) -> Dict[str, Dict[str, Decimal]]:
+        ledger = self.orchestrator.ledger_snapshot()
+        if request.get("user_id") is None:
+            return ledger
+        wallet_ids = {wallet.wallet_id for wallet in self.wallets.list_wallets(_int_field(request, "user_id"))}
+        return {wallet_id: tokens for wallet_id, tokens in ledger.items() if wallet_id in wallet_ids}
+
+    def _history(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [_result_payload(result) for result in self.orchestrator.history()]
+
+
+def _int_field(request: Dict[str, Any], name: str) -> int:
+    value = request[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise EngineError(f"{name} must be an integer")
+    if isinstance(value, float) and not (math.isfinite(value) and value.is_integer()):
+        raise EngineError(f"{name} must be an integer")
+    try:
+        return int(value)
+    except ValueError:
+        raise EngineError(f"{name} must be an integer") from None
+
+
+def _wallet_payload(wallet: Wallet) -> Dict[str, Any]:
+    return {
+        "wallet_id": wallet.wallet_id,
+        "owner_id": wallet.owner_id,
+        "chain": wallet.chain,
+        "address": wallet.address,
+        "is_custodial": wallet.is_custodial,
+    }
+
+
+def _result_payload(result: ExecutionResult) -> Dict[str, Any]:
+    bundle = result.bundle
+    return {
+        "bundle_id": bundle.bundle_id,
+        "token_address": bundle.token_address,
+        "side": bundle.side.value,
+        "total_amount": bundle.total_amount,
+        "wallet_count": bundle.wallet_count(),
+        "order_ids": [order.order_id for order in bundle.orders],
+        "tx_hash": result.tx_hash,
+        "notes": result.notes,
+    }
+
+
+def _serve_line(engine: Engine, line: str) -> str:
+    """Answer one request line; unexpected errors are logged, never raised."""
+    try:
+        return engine.handle_line(line)
+    except Exception:
+        logger.exception("Unhandled error serving engine request")
+        return json.dumps({"id": None, "ok": False, "error": "internal error"})
+
+
+def run_stdio(engine: Engine, stdin: TextIO, stdout: TextIO) -> None:
+    for line in stdin:
+        if not line.strip():
+            continue
+        stdout.write(_serve_line(engine, line) + "\n")
+        stdout.flush()
+
+
+def run_socket(engine: Engine, host: Optional[str] = None, port: Optional[int] = None, path: Optional[str] = None) -> None:
+    """Serve JSON lines on TCP ``host:port`` or Unix socket ``path``; clients share one engine."""
+    import asyncio
+
+    async def on_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                try:
+                    response = _serve_line(engine, line.decode())
+                except UnicodeDecodeError:
+                    response = json.dumps({"id": None, "ok": False, "error": "request must be UTF-8"})
+                writer.write(response.encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve() -> None:
+        if path is not None:
+            server = await asyncio.start_unix_server(on_client, path=path)
+        else:
+            server = await asyncio.start_server(on_client, host=host, port=port)
+        logger.info("Engine listening on %s", path or f"{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
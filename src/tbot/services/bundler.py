@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from collections import defaultdict, deque
 from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal
 from typing import Deque, Dict, Iterable, List, Sequence
 
@@ -59,6 +60,14 @@ class OrderBundler:
                 bundles.extend(self._drain_all(key))
         return bundles
 
+    def flush_stale(self, cutoff: datetime) -> List[Bundle]:
+        """Force out every queue whose oldest order was created at or before ``cutoff``."""
+        bundles: List[Bundle] = []
+        for key, queue in list(self._queues.items()):
+            if queue and queue[0].created_at <= cutoff:
+                bundles.extend(self._drain_all(key))
+        return bundles
+
     def _drain_threshold_bundles(self, key: tuple[str, OrderSide]) -> List[Bundle]:
         queue = self._queues[key]
         bundles: List[Bundle] = []
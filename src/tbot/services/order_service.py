@@ -2,12 +2,19 @@ from __future__ import annotations
 
 from collections import defaultdict
 from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional
+from functools import partial
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
 
 from ..models import Bundle, ExecutionResult, Order, OrderSide
 from .bundler import OrderBundler
 
+if TYPE_CHECKING:
+    import asyncio
+
+    from .submission import Receipt, TransactionSubmitter
+
 
 @dataclass
 class RoutingDecision:
@@ -42,38 +49,65 @@ class PositionLedger:
 
 
 class OrderOrchestrator:
-    """High level service that normalizes and routes orders via the bundler."""
-
-    def __init__(self, bundler: OrderBundler | None = None) -> None:
+    """High level service that normalizes and routes orders via the bundler.
+
+    Without a ``submitter`` bundles are settled immediately by the mock
+    execution layer. With one, bundles are broadcast on-chain and the ledger
+    is only updated once their receipt arrives; this requires ``submit_order``
+    and ``flush`` to be called from inside a running event loop.
+    """
+
+    def __init__(
+        self,
+        bundler: OrderBundler | None = None,
+        submitter: "TransactionSubmitter | None" = None,
+    ) -> None:
         self._bundler = bundler or OrderBundler()
+        self._submitter = submitter
         self._executed_bundles: List[ExecutionResult] = []
+        self._failed_bundles: List[ExecutionResult] = []
         self._ledger = PositionLedger()
+        self._pending: Set["asyncio.Task[Receipt]"] = set()
 
     def submit_order(self, order: Order) -> List[ExecutionResult]:
-        bundles = self._bundler.add_order(order)
-        results: List[ExecutionResult] = []
-        for bundle in bundles:
-            decision = self._choose_route(bundle)
-            result = self._execute_bundle(bundle, decision)
-            results.append(result)
-            self._executed_bundles.append(result)
-            self._ledger.apply_execution(result)
-        return results
+        return self._process(self._bundler.add_order(order))
 
     def flush(self, force: bool = False) -> List[ExecutionResult]:
-        bundles = self._bundler.flush(force=force)
+        return self._process(self._bundler.flush(force=force))
+
+    async def wait_for_settlement(self) -> None:
+        """Wait until every submitted bundle has confirmed or failed."""
+        import asyncio
+
+        while self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _process(self, bundles: List[Bundle]) -> List[ExecutionResult]:
         results: List[ExecutionResult] = []
         for bundle in bundles:
             decision = self._choose_route(bundle)
-            result = self._execute_bundle(bundle, decision)
+            if self._submitter is None:
+                result = self._execute_bundle(bundle, decision)
+                self._settle(result)
+            else:
+                result = self._dispatch_bundle(bundle, decision)
             results.append(result)
-            self._executed_bundles.append(result)
-            self._ledger.apply_execution(result)
         return results
 
+    def _settle(self, result: ExecutionResult) -> None:
+        self._executed_bundles.append(result)
+        self._ledger.apply_execution(result)
+
     def history(self) -> List[ExecutionResult]:
         return list(self._executed_bundles)
 
+    def failures(self) -> List[ExecutionResult]:
+        """Bundles whose on-chain submission failed; their orders are marked failed."""
+        return list(self._failed_bundles)
+
     def set_min_wallets(self, wallet_count: int) -> None:
         self._bundler.set_min_wallets(wallet_count)
 
@@ -106,6 +140,41 @@ class OrderOrchestrator:
         )
         return ExecutionResult(bundle=bundle, tx_hash=tx_hash, notes=notes)
 
+    def _dispatch_bundle(self, bundle: Bundle, decision: RoutingDecision) -> ExecutionResult:
+        result = ExecutionResult(
+            bundle=bundle,
+            notes=f"Submitted via {decision.route}, awaiting confirmation",
+        )
+        task = self._submitter.submit(bundle)
+        self._pending.add(task)
+        task.add_done_callback(partial(self._on_receipt, result, decision))
+        return result
+
+    def _on_receipt(
+        self,
+        result: ExecutionResult,
+        decision: RoutingDecision,
+        task: "asyncio.Task[Receipt]",
+    ) -> None:
+        self._pending.discard(task)
+        error = None if task.cancelled() else task.exception()
+        if task.cancelled() or error is not None:
+            for order in result.bundle.orders:
+                order.mark_failed()
+            result.notes = f"Submission via {decision.route} failed: {error or 'cancelled'}"
+            self._failed_bundles.append(result)
+            return
+        receipt = task.result()
+        for order in result.bundle.orders:
+            order.mark_executed()
+        result.tx_hash = receipt.tx_hash
+        result.executed_at = datetime.utcnow()
+        result.notes = (
+            f"Confirmed via {decision.route} in block {receipt.block_number}"
+            f" at {receipt.gas_price} gwei"
+        )
+        self._settle(result)
+
 
 def normalize_amount(amount: str | float | Decimal) -> Decimal:
     if isinstance(amount, Decimal):
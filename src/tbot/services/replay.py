@@ -0,0 +1,332 @@
+"""Offline order-flow replay for tuning bundler thresholds.
+
+Recorded or synthetic order logs are pushed through :class:`OrderBundler`
+under many ``(min_wallets, max_wait)`` configurations, fanned out over a
+process pool. Each run reports, per token tier, the fraction of gas saved
+against executing every order on its own and the time-to-fill percentiles.
+
+Run ``python -m tbot.services.replay --help`` for the command line interface.
+Requires the ``replay`` extra (NumPy).
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import product
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models import Bundle, Order, OrderSide, OrderStatus
+from .bundler import DEFAULT_THRESHOLDS, BundleThreshold, OrderBundler
+
+REPLAY_EPOCH = datetime(1970, 1, 1)
+PERCENTILES: Tuple[int, ...] = (50, 90, 99)
+DEFAULT_WALLET_THRESHOLDS: Tuple[int, ...] = tuple(t.wallet_count for t in DEFAULT_THRESHOLDS)
+
+
+@dataclass(slots=True)
+class ReplayRecord:
+    """A single order observed at ``timestamp`` seconds into the log."""
+
+    timestamp: float
+    user_id: int
+    wallet_id: str
+    token_address: str
+    side: OrderSide
+    amount: Decimal
+    tier: str = "default"
+
+
+@dataclass(frozen=True)
+class ReplayConfig:
+    """Bundler configuration evaluated by a single replay run."""
+
+    min_wallets: int
+    max_wait: float
+    thresholds: Tuple[int, ...] = DEFAULT_WALLET_THRESHOLDS
+
+
+@dataclass(frozen=True)
+class GasModel:
+    """Gas units for a standalone swap and for each order allocated inside a bundle."""
+
+    swap_gas: int = 120_000
+    allocation_gas: int = 25_000
+
+
+@dataclass(slots=True)
+class TradeoffPoint:
+    """Gas saved versus time-to-fill for one configuration and token tier."""
+
+    min_wallets: int
+    max_wait: float
+    tier: str
+    orders: int
+    bundles: int
+    gas_saved: float
+    fill_percentiles: Dict[int, float] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class _ReplayTrace:
+    wait_seconds: List[float] = field(default_factory=list)
+    order_tiers: List[str] = field(default_factory=list)
+    bundle_sizes: List[int] = field(default_factory=list)
+    bundle_tiers: List[str] = field(default_factory=list)
+
+    def settle(self, bundle: Bundle, filled_at: datetime) -> None:
+        tier = bundle.orders[0].options.get("tier", "default")
+        self.bundle_sizes.append(len(bundle.orders))
+        self.bundle_tiers.append(tier)
+        for order in bundle.orders:
+            self.wait_seconds.append((filled_at - order.created_at).total_seconds())
+            self.order_tiers.append(tier)
+
+
+def replay(records: Sequence[ReplayRecord], config: ReplayConfig, gas: GasModel | None = None) -> List[TradeoffPoint]:
+    """Replay time-ordered ``records`` through a fresh bundler and summarize per tier.
+
+    Queues whose oldest order has waited ``config.max_wait`` seconds are force
+    flushed at that deadline; anything still queued when the log ends is
+    flushed at its head's deadline as well.
+    """
+    bundler = OrderBundler(
+        thresholds=[BundleThreshold(size) for size in config.thresholds],
+        min_wallets=config.min_wallets,
+    )
+    max_wait = timedelta(seconds=config.max_wait)
+    trace = _ReplayTrace()
+    # Lazily pruned heap of queued orders keyed by arrival, so that we only ask
+    # the bundler to scan its queues when some pending order has gone stale.
+    arrivals: List[Tuple[datetime, int, Order]] = []
+
+    for seq, record in enumerate(records):
+        now = REPLAY_EPOCH + timedelta(seconds=record.timestamp)
+        _expire(bundler, arrivals, now - max_wait, max_wait, trace)
+        order = Order(
+            user_id=record.user_id,
+            wallet_id=record.wallet_id,
+            token_address=record.token_address,
+            side=record.side,
+            amount=record.amount,
+            options={"tier": record.tier},
+            created_at=now,
+        )
+        heapq.heappush(arrivals, (now, seq, order))
+        for bundle in bundler.add_order(order):
+            trace.settle(bundle, now)
+
+    for bundle in bundler.flush(force=True):
+        trace.settle(bundle, bundle.orders[0].created_at + max_wait)
+    return summarize(trace, config, gas or GasModel())
+
+
+def _expire(
+    bundler: OrderBundler,
+    arrivals: List[Tuple[datetime, int, Order]],
+    cutoff: datetime,
+    max_wait: timedelta,
+    trace: _ReplayTrace,
+) -> None:
+    while arrivals and arrivals[0][0] <= cutoff:
+        _, _, order = heapq.heappop(arrivals)
+        if order.status is not OrderStatus.PENDING:
+            continue
+        for bundle in bundler.flush_stale(cutoff):
+            trace.settle(bundle, bundle.orders[0].created_at + max_wait)
+
+
+def summarize(trace: _ReplayTrace, config: ReplayConfig, gas: GasModel) -> List[TradeoffPoint]:
+    waits = np.asarray(trace.wait_seconds, dtype=np.float64)
+    order_tiers = np.asarray(trace.order_tiers)
+    sizes = np.asarray(trace.bundle_sizes, dtype=np.int64)
+    bundle_tiers = np.asarray(trace.bundle_tiers)
+
+    points: List[TradeoffPoint] = []
+    for tier in np.unique(order_tiers):
+        tier_waits = waits[order_tiers == tier]
+        tier_sizes = sizes[bundle_tiers == tier]
+        unbundled = tier_sizes.sum() * gas.swap_gas
+        bundled = (gas.swap_gas + tier_sizes * gas.allocation_gas).sum()
+        percentiles = np.percentile(tier_waits, PERCENTILES)
+        points.append(
+            TradeoffPoint(
+                min_wallets=config.min_wallets,
+                max_wait=config.max_wait,
+                tier=str(tier),
+                orders=int(tier_waits.size),
+                bundles=int(tier_sizes.size),
+                gas_saved=float(1 - bundled / unbundled),
+                fill_percentiles={p: float(v) for p, v in zip(PERCENTILES, percentiles)},
+            )
+        )
+    return points
+
+
+_WORKER_RECORDS: Sequence[ReplayRecord] = ()
+_WORKER_GAS: GasModel = GasModel()
+
+
+def _init_worker(records: Sequence[ReplayRecord], gas: GasModel) -> None:
+    global _WORKER_RECORDS, _WORKER_GAS
+    _WORKER_RECORDS = records
+    _WORKER_GAS = gas
+
+
+def _replay_in_worker(config: ReplayConfig) -> List[TradeoffPoint]:
+    return replay(_WORKER_RECORDS, config, _WORKER_GAS)
+
+
+def sweep(
+    records: Iterable[ReplayRecord],
+    configs: Sequence[ReplayConfig],
+    gas: GasModel | None = None,
+    workers: Optional[int] = None,
+) -> List[TradeoffPoint]:
+    """Replay ``records`` under every config, in parallel when ``workers`` != 1.
+
+    The order log is shipped to each worker process once at start-up rather
+    than once per configuration.
+    """
+    ordered = sorted(records, key=lambda record: record.timestamp)
+    gas = gas or GasModel()
+    workers = workers or min(len(configs), os.cpu_count() or 1)
+    if workers <= 1:
+        runs = [replay(ordered, config, gas) for config in configs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(ordered, gas)
+        ) as pool:
+            runs = list(pool.map(_replay_in_worker, configs))
+    return [point for run in runs for point in run]
+
+
+def load_records(path: Path) -> List[ReplayRecord]:
+    """Read a JSON-lines order log with one order object per line."""
+    records: List[ReplayRecord] = []
+    with path.open() as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            raw = json.loads(line)
+            records.append(
+                ReplayRecord(
+                    timestamp=float(raw["timestamp"]),
+                    user_id=int(raw["user_id"]),
+                    wallet_id=str(raw["wallet_id"]),
+                    token_address=raw["token_address"],
+                    side=OrderSide(raw["side"]),
+                    amount=Decimal(str(raw["amount"])),
+                    tier=raw.get("tier", "default"),
+                )
+            )
+    return records
+
+
+def synthetic_records(
+    duration: float,
+    rates: Dict[str, float],
+    tokens_per_tier: int = 10,
+    wallets: int = 500,
+    seed: int = 0,
+) -> List[ReplayRecord]:
+    """Generate Poisson order flow for ``duration`` seconds.
+
+    ``rates`` maps a tier name to its aggregate orders per second; orders in a
+    tier are spread over its tokens with a Zipf-like popularity skew.
+    """
+    rng = np.random.default_rng(seed)
+    records: List[ReplayRecord] = []
+    sides = np.array([OrderSide.BUY, OrderSide.SELL], dtype=object)
+    popularity = 1.0 / np.arange(1, tokens_per_tier + 1)
+    popularity /= popularity.sum()
+    for tier, rate in rates.items():
+        count = rng.poisson(rate * duration)
+        timestamps = np.sort(rng.uniform(0.0, duration, count))
+        tokens = rng.choice(tokens_per_tier, size=count, p=popularity)
+        wallet_ids = rng.integers(0, wallets, size=count)
+        order_sides = sides[rng.integers(0, 2, size=count)]
+        amounts = np.round(rng.lognormal(0.0, 1.0, size=count), 4)
+        for ts, token, wallet, side, amount in zip(timestamps, tokens, wallet_ids, order_sides, amounts):
+            records.append(
+                ReplayRecord(
+                    timestamp=float(ts),
+                    user_id=int(wallet),
+                    wallet_id=f"wallet-{wallet}",
+                    token_address=f"{tier}-token-{token}",
+                    side=side,
+                    amount=Decimal(str(amount)),
+                    tier=tier,
+                )
+            )
+    records.sort(key=lambda record: record.timestamp)
+    return records
+
+
+def format_tradeoffs(points: Iterable[TradeoffPoint]) -> str:
+    header = ["tier", "min_wallets", "max_wait_s", "orders", "bundles", "gas_saved"]
+    header.extend(f"p{p}_fill_s" for p in PERCENTILES)
+    lines = ["\t".join(header)]
+    for point in sorted(points, key=lambda p: (p.tier, p.min_wallets, p.max_wait)):
+        row = [
+            point.tier,
+            str(point.min_wallets),
+            f"{point.max_wait:g}",
+            str(point.orders),
+            str(point.bundles),
+            f"{point.gas_saved:.3f}",
+        ]
+        row.extend(f"{point.fill_percentiles[p]:.1f}" for p in PERCENTILES)
+        lines.append("\t".join(row))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", type=Path, help="JSON-lines order log to replay")
+    source.add_argument("--synthetic-hours", type=float, help="generate this many hours of order flow")
+    parser.add_argument(
+        "--min-wallets",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_WALLET_THRESHOLDS),
+    )
+    parser.add_argument("--max-wait", type=float, nargs="+", default=[30.0, 60.0, 300.0, 900.0])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    invalid = sorted(set(args.min_wallets) - set(DEFAULT_WALLET_THRESHOLDS))
+    if invalid:
+        parser.error(
+            f"--min-wallets {' '.join(map(str, invalid))} not among configured thresholds"
+            f" {'/'.join(map(str, DEFAULT_WALLET_THRESHOLDS))}"
+        )
+
+    if args.input is not None:
+        records = load_records(args.input)
+    else:
+        records = synthetic_records(
+            args.synthetic_hours * 3600,
+            rates={"major": 0.5, "mid": 0.2, "micro": 0.05},
+            seed=args.seed,
+        )
+    configs = [
+        ReplayConfig(min_wallets=min_wallets, max_wait=max_wait)
+        for min_wallets, max_wait in product(args.min_wallets, args.max_wait)
+    ]
+    print(format_tradeoffs(sweep(records, configs, workers=args.workers)))
+
+
+if __name__ == "__main__":
+    main()
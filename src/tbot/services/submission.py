@@ -0,0 +1,399 @@
+"""Nonce-managed transaction submission with replace-by-fee gas escalation.
+
+Bundles are signed from a pool of operator sender wallets. Each sender has a
+:class:`NonceAllocator` slot that hands out consecutive nonces and lets up to
+``max_in_flight`` transactions be pending at once instead of waiting for every
+receipt. Transactions that are not mined within ``GasPolicy.escalate_after``
+are rebroadcast with the same nonce and a bumped gas price. A transaction
+that still has not confirmed after ``GasPolicy.timeout`` is replaced by a
+self-transfer at its nonce, and is normally only reported as failed once
+that cancellation is mined, so the bundle cannot execute later and the
+sender's later nonces are not left behind a gap. If neither confirms within
+``GasPolicy.cancel_timeout`` the bundle is reported failed with an unknown
+outcome and the sender's nonce is resynced from the chain.
+
+Any exception raised by ``ChainClient.send_transaction`` is treated as a
+failed broadcast and retried; RPC transport errors need no special casing.
+
+:class:`SimulatedChain` is a local stand-in for an RPC node or private relay
+with configurable inclusion delay; ``python -m tbot.services.submission``
+measures bundles confirmed per second against it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+from ..models import Bundle, OrderSide
+
+logger = logging.getLogger(__name__)
+
+CANCEL_PAYLOAD = "cancel"
+
+
+class SubmissionError(RuntimeError):
+    """Raised when a transaction is rejected or never confirms."""
+
+
+@dataclass(slots=True)
+class Transaction:
+    sender: str
+    nonce: int
+    gas_price: int
+    payload: str
+    tx_hash: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.tx_hash:
+            digest = hashlib.sha256(
+                f"{self.sender}:{self.nonce}:{self.gas_price}:{self.payload}".encode()
+            )
+            self.tx_hash = "0x" + digest.hexdigest()
+
+
+@dataclass(slots=True)
+class Receipt:
+    tx_hash: str
+    sender: str
+    nonce: int
+    gas_price: int
+    block_number: int
+
+
+class ChainClient(Protocol):
+    """Minimal surface shared by RPC nodes, private relays and the simulator."""
+
+    async def get_transaction_count(self, sender: str) -> int: ...
+
+    async def send_transaction(self, tx: Transaction) -> None: ...
+
+    async def get_receipt(self, tx_hash: str) -> Optional[Receipt]: ...
+
+
+@dataclass(frozen=True)
+class GasPolicy:
+    """Gas prices are in gwei, durations in seconds."""
+
+    initial_gas_price: int = 10
+    bump_ratio: Decimal = Decimal("0.125")
+    max_gas_price: int = 500
+    escalate_after: float = 0.5
+    poll_interval: float = 0.01
+    timeout: float = 30.0
+    max_cancel_gas_price: int = 1000
+    cancel_timeout: float = 60.0
+
+    def escalate(self, gas_price: int) -> int:
+        return min(self._bump(gas_price), self.max_gas_price)
+
+    def cancellation(self, gas_price: int) -> int:
+        """Price for a self-transfer replacing a transaction priced at ``gas_price``."""
+        return min(self._bump(gas_price), self.max_cancel_gas_price)
+
+    def _bump(self, gas_price: int) -> int:
+        return int(Decimal(gas_price) * (1 + self.bump_ratio)) + 1
+
+
+class SimulatedChain:
+    """In-process chain that mines pending transactions in nonce order.
+
+    A transaction is eligible for inclusion once it has been in the mempool for
+    ``inclusion_delay`` seconds and pays at least ``base_fee``. Replacing a
+    pending nonce requires a gas bump of ``replacement_bump`` and restarts the
+    inclusion delay, as a rebroadcast would on a real network.
+    """
+
+    def __init__(
+        self,
+        inclusion_delay: float = 0.05,
+        block_time: float = 0.01,
+        base_fee: int = 10,
+        replacement_bump: Decimal = Decimal("0.1"),
+    ) -> None:
+        self.inclusion_delay = inclusion_delay
+        self.block_time = block_time
+        self.base_fee = base_fee
+        self.replacement_bump = replacement_bump
+        self.block_number = 0
+        self._mempool: Dict[Tuple[str, int], Tuple[Transaction, float]] = {}
+        self._confirmed_nonce: Dict[str, int] = {}
+        self._receipts: Dict[str, Receipt] = {}
+        self._miner: Optional[asyncio.Task[None]] = None
+
+    async def __aenter__(self) -> "SimulatedChain":
+        self._miner = asyncio.create_task(self._mine_forever())
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self._miner is not None:
+            self._miner.cancel()
+            try:
+                await self._miner
+            except asyncio.CancelledError:
+                pass
+            self._miner = None
+
+    async def get_transaction_count(self, sender: str) -> int:
+        return self._confirmed_nonce.get(sender, 0)
+
+    async def send_transaction(self, tx: Transaction) -> None:
+        if tx.nonce < self._confirmed_nonce.get(tx.sender, 0):
+            raise SubmissionError("nonce too low")
+        key = (tx.sender, tx.nonce)
+        existing = self._mempool.get(key)
+        if existing is not None:
+            minimum = Decimal(existing[0].gas_price) * (1 + self.replacement_bump)
+            if tx.gas_price < minimum:
+                raise SubmissionError("replacement transaction underpriced")
+        self._mempool[key] = (tx, asyncio.get_running_loop().time())
+
+    async def get_receipt(self, tx_hash: str) -> Optional[Receipt]:
+        return self._receipts.get(tx_hash)
+
+    def mine_block(self, now: float) -> List[Receipt]:
+        self.block_number += 1
+        mined: List[Receipt] = []
+        for sender in {sender for sender, _ in self._mempool}:
+            nonce = self._confirmed_nonce.get(sender, 0)
+            while (sender, nonce) in self._mempool:
+                tx, seen_at = self._mempool[(sender, nonce)]
+                if tx.gas_price < self.base_fee or now - seen_at < self.inclusion_delay:
+                    break
+                del self._mempool[(sender, nonce)]
+                receipt = Receipt(tx.tx_hash, sender, nonce, tx.gas_price, self.block_number)
+                self._receipts[tx.tx_hash] = receipt
+                mined.append(receipt)
+                nonce += 1
+            self._confirmed_nonce[sender] = nonce
+        return mined
+
+    async def _mine_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.block_time)
+            self.mine_block(loop.time())
+
+
+class NonceAllocator:
+    """Hands out consecutive nonces per sender with bounded pipelining."""
+
+    def __init__(self, chain: ChainClient, max_in_flight: int = 16) -> None:
+        self._chain = chain
+        self._max_in_flight = max_in_flight
+        self._next_nonce: Dict[str, int] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._sync_lock = asyncio.Lock()
+
+    async def acquire(self, sender: str) -> int:
+        slots = self._slots.setdefault(sender, asyncio.Semaphore(self._max_in_flight))
+        await slots.acquire()
+        try:
+            if sender not in self._next_nonce:
+                async with self._sync_lock:
+                    if sender not in self._next_nonce:
+                        self._next_nonce[sender] = await self._chain.get_transaction_count(sender)
+        except BaseException:
+            slots.release()
+            raise
+        nonce = self._next_nonce[sender]
+        self._next_nonce[sender] = nonce + 1
+        self._in_flight[sender] = self._in_flight.get(sender, 0) + 1
+        return nonce
+
+    def mark_stuck(self, sender: str) -> None:
+        """Re-read the sender's nonce from the chain on its next ``acquire``."""
+        self._next_nonce.pop(sender, None)
+
+    def release(self, sender: str) -> None:
+        self._in_flight[sender] -= 1
+        self._slots[sender].release()
+
+    def in_flight(self, sender: str) -> int:
+        return self._in_flight.get(sender, 0)
+
+
+class TransactionSubmitter:
+    """Submits bundles from a pool of sender wallets and tracks their receipts."""
+
+    def __init__(
+        self,
+        chain: ChainClient,
+        senders: Sequence[str],
+        policy: GasPolicy | None = None,
+        max_in_flight: int = 16,
+    ) -> None:
+        if not senders:
+            raise ValueError("at least one sender wallet is required")
+        self._chain = chain
+        self._policy = policy or GasPolicy()
+        self._nonces = NonceAllocator(chain, max_in_flight=max_in_flight)
+        self._senders = itertools.cycle(senders)
+        self.escalations = 0
+
+    def submit(self, bundle: Bundle) -> "asyncio.Task[Receipt]":
+        """Schedule ``bundle`` for submission; must be called inside a running loop."""
+        return asyncio.get_running_loop().create_task(
+            self._submit(next(self._senders), bundle.bundle_id)
+        )
+
+    async def _submit(self, sender: str, payload: str) -> Receipt:
+        policy = self._policy
+        loop = asyncio.get_running_loop()
+        nonce = await self._nonces.acquire(sender)
+        try:
+            tx = Transaction(sender, nonce, policy.initial_gas_price, payload)
+            broadcasts = [tx.tx_hash]
+            started = broadcast_at = loop.time()
+            # A failed first broadcast is retried on the first escalation below.
+            await self._broadcast(tx)
+            while True:
+                await asyncio.sleep(policy.poll_interval)
+                receipt = await self._first_receipt(broadcasts)
+                if receipt is not None:
+                    return receipt
+                now = loop.time()
+                if now - started > policy.timeout:
+                    break
+                if now - broadcast_at >= policy.escalate_after and tx.gas_price < policy.max_gas_price:
+                    replacement = Transaction(sender, nonce, policy.escalate(tx.gas_price), payload)
+                    broadcast_at = now
+                    if not await self._broadcast(replacement):
+                        # Already mined (picked up on the next poll), the capped
+                        # bump was too small to replace, or transport failure.
+                        continue
+                    tx = replacement
+                    broadcasts.append(tx.tx_hash)
+                    self.escalations += 1
+            receipt = await self._cancel(sender, nonce, tx.gas_price, broadcasts)
+            if receipt is None:
+                self._nonces.mark_stuck(sender)
+                raise SubmissionError(
+                    f"transaction {sender}:{nonce} not confirmed and cancellation not mined"
+                    f" after {policy.cancel_timeout}s; outcome unknown, nonce will be resynced"
+                )
+            if receipt.tx_hash in broadcasts:
+                return receipt
+            raise SubmissionError(
+                f"transaction {sender}:{nonce} not confirmed after {policy.timeout}s; nonce cancelled"
+            )
+        finally:
+            self._nonces.release(sender)
+
+    async def _cancel(
+        self, sender: str, nonce: int, gas_price: int, broadcasts: List[str]
+    ) -> Optional[Receipt]:
+        """Consume ``nonce`` with a self-transfer so later nonces are not stuck behind it.
+
+        The original broadcasts are watched alongside the cancellation, so if one
+        of them wins the race its receipt is returned and the bundle settles.
+        Returns ``None`` if nothing is mined within ``GasPolicy.cancel_timeout``.
+        """
+        policy = self._policy
+        loop = asyncio.get_running_loop()
+        watched = list(broadcasts)
+        cancel_gas = gas_price
+        broadcast_at = None
+        deadline = loop.time() + policy.cancel_timeout
+        while True:
+            now = loop.time()
+            if now > deadline:
+                return None
+            if broadcast_at is None or (
+                now - broadcast_at >= policy.escalate_after and cancel_gas < policy.max_cancel_gas_price
+            ):
+                cancel = Transaction(sender, nonce, policy.cancellation(cancel_gas), CANCEL_PAYLOAD)
+                broadcast_at = now
+                if await self._broadcast(cancel):
+                    cancel_gas = cancel.gas_price
+                    watched.append(cancel.tx_hash)
+            receipt = await self._first_receipt(watched)
+            if receipt is not None:
+                return receipt
+            if await self._mined_past(sender, nonce):
+                # The nonce was mined, but not by a hash we sent; re-check once
+                # in case a receipt landed between the two calls.
+                receipt = await self._first_receipt(watched)
+                if receipt is not None:
+                    return receipt
+                raise SubmissionError(f"nonce {sender}:{nonce} consumed by an unknown transaction")
+            await asyncio.sleep(policy.poll_interval)
+
+    async def _broadcast(self, tx: Transaction) -> bool:
+        try:
+            await self._chain.send_transaction(tx)
+        except Exception as exc:
+            logger.debug("Broadcast of %s:%s at %s gwei failed: %s", tx.sender, tx.nonce, tx.gas_price, exc)
+            return False
+        return True
+
+    async def _first_receipt(self, tx_hashes: List[str]) -> Optional[Receipt]:
+        for tx_hash in tx_hashes:
+            try:
+                receipt = await self._chain.get_receipt(tx_hash)
+            except Exception as exc:
+                logger.debug("Receipt lookup for %s failed: %s", tx_hash, exc)
+                continue
+            if receipt is not None:
+                return receipt
+        return None
+
+    async def _mined_past(self, sender: str, nonce: int) -> bool:
+        try:
+            return await self._chain.get_transaction_count(sender) > nonce
+        except Exception as exc:
+            logger.debug("Nonce lookup for %s failed: %s", sender, exc)
+            return False
+
+
+async def measure_throughput(
+    bundles: int,
+    senders: int = 4,
+    max_in_flight: int = 16,
+    inclusion_delay: float = 0.05,
+) -> float:
+    """Submit ``bundles`` through an orchestrator and return bundles confirmed per second."""
+    from .order_service import OrderOrchestrator, make_order
+
+    async with SimulatedChain(inclusion_delay=inclusion_delay) as chain:
+        submitter = TransactionSubmitter(
+            chain,
+            [f"0xsender{idx:02d}" for idx in range(senders)],
+            max_in_flight=max_in_flight,
+        )
+        orchestrator = OrderOrchestrator(submitter=submitter)
+        started = time.perf_counter()
+        for idx in range(bundles * 5):
+            orchestrator.submit_order(
+                make_order(idx, f"wallet-{idx}", "0xabc", OrderSide.BUY, "1")
+            )
+        await orchestrator.wait_for_settlement()
+        elapsed = time.perf_counter() - started
+    return len(orchestrator.history()) / elapsed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure bundles confirmed per second on a simulated chain")
+    parser.add_argument("--bundles", type=int, default=500)
+    parser.add_argument("--senders", type=int, default=4)
+    parser.add_argument("--max-in-flight", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--inclusion-delay", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    for max_in_flight in args.max_in_flight:
+        rate = asyncio.run(
+            measure_throughput(args.bundles, args.senders, max_in_flight, args.inclusion_delay)
+        )
+        print(f"max_in_flight={max_in_flight}\tbundles_per_second={rate:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Cold-start measurement for the package's entrypoints.
+
+Each target is imported in a fresh interpreter so that nothing is served from
+an already-populated ``sys.modules``.
+"""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Optional, Sequence
+
+DEFAULT_TARGETS: Sequence[str] = ("tbot", "tbot.engine", "tbot.telegram.app")
+
+
+def measure_import(module: str, runs: int = 5) -> float:
+    """Return the median wall time in milliseconds to start Python and import ``module``."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", f"import {module}"],
+            check=True,
+            stderr=subprocess.DEVNULL,
+        )
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def measure_startup(targets: Sequence[str] = DEFAULT_TARGETS, runs: int = 5) -> Dict[str, Optional[float]]:
+    """Time each target; targets that fail to import are reported as ``None``."""
+    baseline = measure_import("sys", runs)
+    results: Dict[str, Optional[float]] = {"python": baseline}
+    for module in targets:
+        try:
+            results[module] = measure_import(module, runs)
+        except subprocess.CalledProcessError:
+            results[module] = None
+    return results
+
+
+def format_startup(results: Dict[str, Optional[float]]) -> str:
+    baseline = results.get("python") or 0.0
+    lines = ["target\tmedian_ms\tover_python_ms"]
+    for target, elapsed in results.items():
+        if elapsed is None:
+            lines.append(f"{target}\tfailed\tfailed")
+        else:
+            lines.append(f"{target}\t{elapsed:.1f}\t{elapsed - baseline:.1f}")
+    return "\n".join(lines)
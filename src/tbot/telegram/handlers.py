@@ -118,9 +118,10 @@ async def _handle_trade(update: Update, context: ContextTypes.DEFAULT_TYPE, side
         return
     messages: List[str] = []
     for result in results:
+        verb = "Executed" if result.tx_hash else "Submitted"
         messages.append(
-            f"Executed bundle {result.bundle.bundle_id[:8]} for {result.bundle.total_amount} tokens\n"
+            f"{verb} bundle {result.bundle.bundle_id[:8]} for {result.bundle.total_amount} tokens\n"
             f"Wallets involved: {result.bundle.wallet_count()} | Users: {result.bundle.user_count()}\n"
-            f"Tx hash: {result.tx_hash}"
+            f"Tx hash: {result.tx_hash or 'pending confirmation'}"
         )
     await update.message.reply_text("\n\n".join(messages))
@@ -1,3 +1,4 @@
+from datetime import datetime
 from decimal import Decimal
 
 from tbot.models import OrderSide
@@ -43,3 +44,19 @@ def test_force_flush_releases_remaining_orders():
     bundles = bundler.flush(force=True)
     assert len(bundles) == 1
     assert bundles[0].wallet_count() == 2
+
+
+def test_flush_stale_only_releases_expired_queues():
+    bundler = OrderBundler(min_wallets=5)
+    stale = list(_make_orders(2, token="0xold"))
+    fresh = list(_make_orders(2, token="0xnew"))
+    for order in stale:
+        order.created_at = datetime(2024, 1, 1, 12, 0)
+        bundler.add_order(order)
+    for order in fresh:
+        order.created_at = datetime(2024, 1, 1, 12, 5)
+        bundler.add_order(order)
+    bundles = bundler.flush_stale(datetime(2024, 1, 1, 12, 1))
+    assert len(bundles) == 1
+    assert bundles[0].token_address == "0xold"
+    assert bundler.queue_depth()[("0xnew", OrderSide.BUY)] == 2
@@ -0,0 +1,121 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from tbot.engine import Engine
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def _run(engine: Engine, **request):
+    return json.loads(engine.handle_line(json.dumps(request)))
+
+
+def test_engine_bundles_orders_and_reports_portfolio():
+    engine = Engine()
+    _run(engine, op="set_min_wallets", wallet_count=5)
+    wallet_ids = []
+    for user_id in range(5):
+        wallet_ids.append(_run(engine, op="create_wallet", user_id=user_id)["result"]["wallet_id"])
+    responses = [
+        _run(engine, id=user_id, op="submit_order", user_id=user_id, token_address="0xabc", side="buy", amount="2")
+        for user_id in range(5)
+    ]
+    assert [response["result"] for response in responses[:4]] == [[], [], [], []]
+    (bundle,) = responses[4]["result"]
+    assert bundle["wallet_count"] == 5
+    assert bundle["total_amount"] == "10"
+    portfolio = _run(engine, op="portfolio", user_id=0)["result"]
+    assert portfolio == {wallet_ids[0]: {"0xabc": "2"}}
+
+
+def test_engine_reports_errors_without_raising():
+    engine = Engine()
+    assert _run(engine, id=1, op="submit_order", user_id=1, token_address="0xabc", side="buy", amount="1") == {
+        "id": 1,
+        "ok": False,
+        "error": "no wallets found for user; call create_wallet first",
+    }
+    assert _run(engine, op="list_wallets")["error"] == "missing field 'user_id'"
+    assert _run(engine, op="unknown")["ok"] is False
+    assert json.loads(engine.handle_line("not json"))["ok"] is False
+
+
+def test_engine_rejects_mistyped_fields():
+    engine = Engine()
+    assert _run(engine, id=1, op="list_wallets", user_id=None)["ok"] is False
+    assert _run(engine, op="flush", force="false") == {
+        "id": None,
+        "ok": False,
+        "error": "force must be a JSON boolean",
+    }
+    assert _run(engine, op="create_wallet", user_id=3)["ok"] is True
+
+
+def test_engine_rejects_unhashable_op_and_overflowing_ints():
+    engine = Engine()
+    assert _run(engine, id=1, op=["x"]) == {"id": 1, "ok": False, "error": "unknown op ['x']"}
+    response = json.loads(engine.handle_line('{"id": 2, "op": "create_wallet", "user_id": 1e400}'))
+    assert response == {"id": 2, "ok": False, "error": "user_id must be an integer"}
+    assert _run(engine, op="list_wallets", user_id=True)["ok"] is False
+    assert _run(engine, op="list_wallets", user_id="4")["ok"] is True
+
+
+def test_engine_command_survives_bad_request():
+    requests = "\n".join(
+        (
+            '{"id": 1, "op": "list_wallets", "user_id": null}',
+            '{"id": 2, "op": ["x"]}',
+            '{"id": 3, "op": "create_wallet", "user_id": 1e400}',
+            '{"id": 4, "op": "list_wallets", "user_id": 1}',
+        )
+    )
+    completed = subprocess.run(
+        [sys.executable, "-m", "tbot", "engine"],
+        input=requests,
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=SRC,
+    )
+    responses = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert [(response["id"], response["ok"]) for response in responses] == [
+        (1, False),
+        (2, False),
+        (3, False),
+        (4, True),
+    ]
+
+
+def test_package_import_is_lazy():
+    code = (
+        "import sys, tbot\n"
+        "assert not any(name.startswith(('tbot.services', 'telegram')) for name in sys.modules)\n"
+        "assert tbot.OrderBundler.__name__ == 'OrderBundler'\n"
+        "assert 'tbot.services.bundler' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=SRC)
+
+
+def test_engine_command_serves_stdin():
+    requests = "\n".join(
+        json.dumps(request)
+        for request in (
+            {"id": 1, "op": "create_wallet", "user_id": 7},
+            {"id": 2, "op": "history"},
+        )
+    )
+    completed = subprocess.run(
+        [sys.executable, "-m", "tbot", "engine"],
+        input=requests,
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=SRC,
+    )
+    responses = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert [response["id"] for response in responses] == [1, 2]
+    assert responses[0]["result"]["owner_id"] == 7
+    assert responses[1]["result"] == []
+    assert "telegram" not in completed.stderr
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from tbot.models import OrderSide
+from tbot.services.replay import ReplayConfig, ReplayRecord, main, replay, sweep, synthetic_records
+
+
+def _records(count: int, spacing: float, tier: str = "major"):
+    return [
+        ReplayRecord(
+            timestamp=idx * spacing,
+            user_id=idx,
+            wallet_id=f"wallet-{idx}",
+            token_address="0xabc",
+            side=OrderSide.BUY,
+            amount=Decimal("1"),
+            tier=tier,
+        )
+        for idx in range(count)
+    ]
+
+
+def test_replay_fills_at_threshold():
+    (point,) = replay(_records(10, spacing=1.0), ReplayConfig(min_wallets=10, max_wait=60.0))
+    assert point.bundles == 1
+    assert point.orders == 10
+    assert point.fill_percentiles[50] == pytest.approx(4.5)
+    assert point.gas_saved > 0
+
+
+def test_replay_max_wait_forces_partial_bundles():
+    (point,) = replay(_records(10, spacing=10.0), ReplayConfig(min_wallets=25, max_wait=30.0))
+    assert point.bundles == 4
+    assert max(point.fill_percentiles.values()) <= 30.0
+
+
+def test_sweep_matches_inline_and_pool_runs():
+    records = synthetic_records(600, rates={"major": 1.0, "micro": 0.1}, tokens_per_tier=3)
+    configs = [ReplayConfig(min_wallets=m, max_wait=60.0) for m in (5, 15)]
+    inline = sweep(records, configs, workers=1)
+    pooled = sweep(records, configs, workers=2)
+    assert inline == pooled
+    assert {point.tier for point in inline} == {"major", "micro"}
+
+
+def test_cli_rejects_unknown_min_wallets(capsys):
+    with pytest.raises(SystemExit):
+        main(["--synthetic-hours", "0.01", "--min-wallets", "7"])
+    assert "--min-wallets 7" in capsys.readouterr().err
@@ -0,0 +1,213 @@
+import asyncio
+from decimal import Decimal
+
+from tbot.models import OrderSide, OrderStatus
+from tbot.services.order_service import OrderOrchestrator, make_order
+from tbot.services.submission import (
+    GasPolicy,
+    NonceAllocator,
+    SimulatedChain,
+    SubmissionError,
+    TransactionSubmitter,
+)
+
+
+def _submit_bundles(orchestrator: OrderOrchestrator, bundles: int, token: str = "0xabc"):
+    results = []
+    for idx in range(bundles * 5):
+        order = make_order(idx, f"wallet-{idx}", token, OrderSide.BUY, Decimal("1"))
+        results.extend(orchestrator.submit_order(order))
+    return results
+
+
+def test_ledger_settles_only_on_confirmation():
+    async def scenario():
+        async with SimulatedChain(inclusion_delay=0.05) as chain:
+            orchestrator = OrderOrchestrator(submitter=TransactionSubmitter(chain, ["0xsender"]))
+            (result,) = _submit_bundles(orchestrator, 1)
+            assert result.tx_hash is None
+            assert orchestrator.ledger_snapshot() == {}
+            assert orchestrator.pending_count() == 1
+            await orchestrator.wait_for_settlement()
+            return orchestrator, result
+
+    orchestrator, result = asyncio.run(scenario())
+    assert result.tx_hash is not None
+    assert result.executed_at is not None
+    assert all(order.status is OrderStatus.EXECUTED for order in result.bundle.orders)
+    assert orchestrator.ledger_snapshot()["wallet-0"]["0xabc"] == Decimal("1")
+
+
+def test_pipelined_nonces_confirm_in_order():
+    async def scenario():
+        async with SimulatedChain(inclusion_delay=0.05) as chain:
+            submitter = TransactionSubmitter(chain, ["0xa", "0xb"], max_in_flight=8)
+            orchestrator = OrderOrchestrator(submitter=submitter)
+            _submit_bundles(orchestrator, 10)
+            await orchestrator.wait_for_settlement()
+            return chain, orchestrator
+
+    chain, orchestrator = asyncio.run(scenario())
+    assert len(orchestrator.history()) == 10
+    assert asyncio.run(chain.get_transaction_count("0xa")) == 5
+    assert asyncio.run(chain.get_transaction_count("0xb")) == 5
+
+
+def test_stuck_transaction_is_escalated():
+    policy = GasPolicy(initial_gas_price=10, escalate_after=0.02, poll_interval=0.005)
+
+    async def scenario():
+        async with SimulatedChain(inclusion_delay=0.0, base_fee=15) as chain:
+            submitter = TransactionSubmitter(chain, ["0xsender"], policy=policy)
+            orchestrator = OrderOrchestrator(submitter=submitter)
+            _submit_bundles(orchestrator, 1)
+            await orchestrator.wait_for_settlement()
+            receipt = await chain.get_receipt(orchestrator.history()[0].tx_hash)
+            return submitter, receipt
+
+    submitter, receipt = asyncio.run(scenario())
+    assert submitter.escalations >= 1
+    assert receipt.gas_price >= 15
+
+
+class _FlakyChain(SimulatedChain):
+    def __init__(self, failures: int, error: Exception = SubmissionError("connection reset"), **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.error = error
+
+    async def send_transaction(self, tx):
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        await super().send_transaction(tx)
+
+
+def test_failed_send_does_not_strand_later_nonces():
+    policy = GasPolicy(escalate_after=0.02, poll_interval=0.005, timeout=1.0)
+
+    async def scenario():
+        async with _FlakyChain(failures=1, inclusion_delay=0.01) as chain:
+            orchestrator = OrderOrchestrator(
+                submitter=TransactionSubmitter(chain, ["0xsender"], policy=policy, max_in_flight=4)
+            )
+            _submit_bundles(orchestrator, 3)
+            await orchestrator.wait_for_settlement()
+            _submit_bundles(orchestrator, 1, token="0xdef")
+            await orchestrator.wait_for_settlement()
+            return chain, orchestrator
+
+    chain, orchestrator = asyncio.run(scenario())
+    assert len(orchestrator.history()) == 4
+    assert orchestrator.failures() == []
+    assert asyncio.run(chain.get_transaction_count("0xsender")) == 4
+
+
+def test_timeout_cancels_nonce_and_marks_orders_failed():
+    policy = GasPolicy(max_gas_price=10, escalate_after=0.005, poll_interval=0.005, timeout=0.05)
+
+    async def scenario():
+        async with SimulatedChain(inclusion_delay=0.0, base_fee=50) as chain:
+            orchestrator = OrderOrchestrator(
+                submitter=TransactionSubmitter(chain, ["0xsender"], policy=policy)
+            )
+            (failed,) = _submit_bundles(orchestrator, 1)
+            await orchestrator.wait_for_settlement()
+            chain.base_fee = 5
+            _submit_bundles(orchestrator, 1, token="0xdef")
+            await orchestrator.wait_for_settlement()
+            return chain, orchestrator, failed
+
+    chain, orchestrator, failed = asyncio.run(scenario())
+    assert orchestrator.failures() == [failed]
+    assert all(order.status is OrderStatus.FAILED for order in failed.bundle.orders)
+    assert "0xabc" not in orchestrator.ledger_snapshot().get("wallet-0", {})
+    assert [result.bundle.token_address for result in orchestrator.history()] == ["0xdef"]
+    assert asyncio.run(chain.get_transaction_count("0xsender")) == 2
+
+
+def test_original_mined_during_cancellation_still_settles():
+    policy = GasPolicy(
+        max_gas_price=10,
+        max_cancel_gas_price=10,
+        escalate_after=0.005,
+        poll_interval=0.005,
+        timeout=0.05,
+    )
+
+    async def scenario():
+        async with SimulatedChain(inclusion_delay=0.0, base_fee=50) as chain:
+            orchestrator = OrderOrchestrator(
+                submitter=TransactionSubmitter(chain, ["0xsender"], policy=policy)
+            )
+            (result,) = _submit_bundles(orchestrator, 1)
+            await asyncio.sleep(0.1)
+            assert orchestrator.pending_count() == 1
+            chain.base_fee = 5
+            await orchestrator.wait_for_settlement()
+            return orchestrator, result
+
+    orchestrator, result = asyncio.run(scenario())
+    assert orchestrator.failures() == []
+    assert orchestrator.history() == [result]
+    assert all(order.status is OrderStatus.EXECUTED for order in result.bundle.orders)
+    assert orchestrator.ledger_snapshot()["wallet-0"]["0xabc"] == Decimal("1")
+
+
+def test_transport_error_on_send_is_retried():
+    policy = GasPolicy(escalate_after=0.02, poll_interval=0.005, timeout=1.0)
+
+    async def scenario():
+        chain = _FlakyChain(failures=1, error=ConnectionError("reset by peer"), inclusion_delay=0.01)
+        async with chain:
+            orchestrator = OrderOrchestrator(
+                submitter=TransactionSubmitter(chain, ["0xsender"], policy=policy, max_in_flight=4)
+            )
+            _submit_bundles(orchestrator, 3)
+            await asyncio.wait_for(orchestrator.wait_for_settlement(), timeout=5)
+            return chain, orchestrator
+
+    chain, orchestrator = asyncio.run(scenario())
+    assert len(orchestrator.history()) == 3
+    assert orchestrator.failures() == []
+    assert asyncio.run(chain.get_transaction_count("0xsender")) == 3
+
+
+def test_unminable_cancellation_gives_up_after_deadline():
+    policy = GasPolicy(
+        max_gas_price=10,
+        max_cancel_gas_price=10,
+        escalate_after=0.005,
+        poll_interval=0.005,
+        timeout=0.03,
+        cancel_timeout=0.03,
+    )
+
+    async def scenario():
+        async with SimulatedChain(inclusion_delay=0.0, base_fee=50) as chain:
+            orchestrator = OrderOrchestrator(
+                submitter=TransactionSubmitter(chain, ["0xsender"], policy=policy)
+            )
+            (failed,) = _submit_bundles(orchestrator, 1)
+            await asyncio.wait_for(orchestrator.wait_for_settlement(), timeout=5)
+            return orchestrator, failed
+
+    orchestrator, failed = asyncio.run(scenario())
+    assert orchestrator.failures() == [failed]
+    assert orchestrator.pending_count() == 0
+    assert "outcome unknown" in failed.notes
+
+
+def test_stuck_sender_resyncs_nonce_from_chain():
+    async def scenario():
+        chain = SimulatedChain()
+        allocator = NonceAllocator(chain)
+        nonces = [await allocator.acquire("0xsender") for _ in range(3)]
+        for _ in nonces:
+            allocator.release("0xsender")
+        allocator.mark_stuck("0xsender")
+        return nonces, await allocator.acquire("0xsender")
+
+    nonces, resynced = asyncio.run(scenario())
+    assert nonces == [0, 1, 2]
+    assert resynced == 0